@@ -1,17 +1,29 @@
-import glob
+import functools
+import gc
+import hashlib
 import os
+import struct
+import tempfile
+import wave
 import subprocess
 import ffmpeg
 from deep_translator import GoogleTranslator
 import pysrt
-from pydub import AudioSegment
 import asyncio
 import threading
+import queue
 import tkinter as tk
 from tkinter import ttk, filedialog
 from tkinter.scrolledtext import ScrolledText
-from gtts import gTTS
+from gtts.tokenizer import Tokenizer, tokenizer_cases
+import aiohttp
 import datetime
+import numpy as np
+
+try:
+    import soxr
+except ImportError:
+    soxr = None
 
 """
 Script para processamento de vídeo com TTS (Text-to-Speech) em lotes.
@@ -23,9 +35,52 @@ Este programa realiza as seguintes operações:
   5. Exibe uma interface gráfica com tkinter para facilitar a utilização.
 """
 
+# Formato canônico de todos os áudios intermediários (segmentos, silêncios e mixagem):
+# PCM 16 bits, mono, 22050 Hz, suficiente para a faixa de frequências da fala
+MIX_FRAME_RATE = 22050
+MIX_CHANNELS = 1
+MIX_SAMPLE_WIDTH = 2
+# Opções de saída do ffmpeg que produzem um WAV no formato canônico
+CANONICAL_WAV_ARGS = [
+    "-ar", str(MIX_FRAME_RATE), "-ac", str(MIX_CHANNELS), "-sample_fmt", "s16", "-c:a", "pcm_s16le", "-f", "wav"
+]
+
+# Cache persistente dos áudios do Google TTS, indexado por SHA-256 do idioma e do texto
+TTS_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tts_cache")
+TTS_CACHE_MAX_BYTES = 256 * 1024 * 1024
+_tts_cache_available = None  # Resultado da verificação de escrita no diretório de cache
+
+# Limites de cada requisição de tradução em lote
+TRANSLATE_BATCH_MAX_TEXTS = 100
+TRANSLATE_BATCH_MAX_CHARS = 4000
+
+# Endpoint do Google TTS (o mesmo utilizado pelo gTTS) e tamanho máximo de texto por requisição
+GOOGLE_TTS_URL = "https://translate.google.com/translate_tts"
+GOOGLE_TTS_MAX_CHARS = 100
+GOOGLE_TTS_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0 Safari/537.36",
+    "Referer": "https://translate.google.com/",
+}
+
+# Número de threads utilizadas pelo ffmpeg na codificação do vídeo final
+FFMPEG_THREADS = os.cpu_count() or 1
+
+# Maior aceleração feita por reamostragem (soxr) em vez do 'atempo' do ffmpeg. A reamostragem também
+# eleva o tom da voz; até ~6% a diferença fica abaixo de um semitom
+SOXR_MAX_FACTOR = 1.06
+
+# Número de legendas processadas e mixadas por vez, limitando a memória e os arquivos temporários
+SUBTITLE_WINDOW_SIZE = 500
+
+# Intervalo (ms) entre as atualizações da interface com os eventos das outras threads
+UI_REFRESH_MS = 50
+
+# Número máximo de arquivos processados por uma única execução do ffmpeg
+FFMPEG_BATCH_SIZE = 50
+
 def get_video_duration_ms(video_path):
     """
-    Retorna a duração do vídeo em milissegundos utilizando o ffprobe.
+    Retorna a duração do vídeo em milissegundos a partir das informações do contêiner (ffmpeg.probe).
 
     Args:
         video_path (str): Caminho para o arquivo de vídeo.
@@ -33,15 +88,8 @@ def get_video_duration_ms(video_path):
     Returns:
         int: Duração do vídeo em milissegundos.
     """
-    result = subprocess.run(
-        [
-            "ffprobe", "-v", "error", "-show_entries",
-            "format=duration", "-of", "default=noprint_wrappers=1:nokey=1",
-            video_path
-        ],
-        stdout=subprocess.PIPE, stderr=subprocess.STDOUT
-    )
-    duration_sec = float(result.stdout)
+    probe = ffmpeg.probe(video_path)
+    duration_sec = float(probe["format"]["duration"])
     return int(duration_sec * 1000)
 
 def read_srt_subtitles(file_path):
@@ -56,47 +104,343 @@ def read_srt_subtitles(file_path):
     """
     return pysrt.open(file_path, encoding="utf-8")
 
-async def async_generate_tts_segment(text, output_audio, duration_ms=None, log_callback=print):
+def tts_cache_available(log_callback=print):
+    """
+    Verifica (uma única vez) se o diretório de cache do TTS pode ser criado e gravado.
+    O cache é opcional: sem ele, os áudios são baixados em arquivos temporários.
+
+    Args:
+        log_callback (function): Função para log de mensagens.
+
+    Returns:
+        bool: True se o cache pode ser utilizado.
+    """
+    global _tts_cache_available
+    if _tts_cache_available is None:
+        try:
+            os.makedirs(TTS_CACHE_DIR, exist_ok=True)
+            fd, probe_path = tempfile.mkstemp(suffix=".tmp", dir=TTS_CACHE_DIR)
+            os.close(fd)
+            os.remove(probe_path)
+            _tts_cache_available = True
+        except OSError as e:
+            _tts_cache_available = False
+            log_callback(f"Cache TTS indisponível em {TTS_CACHE_DIR} ({e}). Os áudios serão gerados sem cache.", "ERROR", "geral")
+    return _tts_cache_available
+
+def get_tts_cache_path(text, lang):
+    """
+    Retorna o caminho do áudio em cache correspondente a um texto e idioma.
+
+    Args:
+        text (str): Texto convertido em áudio.
+        lang (str): Código do idioma utilizado no TTS.
+
+    Returns:
+        str: Caminho do arquivo .mp3 dentro do diretório de cache.
+    """
+    key = hashlib.sha256(f"{lang}|{text}".encode("utf-8")).hexdigest()
+    return os.path.join(TTS_CACHE_DIR, key + ".mp3")
+
+def prune_tts_cache(max_bytes=TTS_CACHE_MAX_BYTES, log_callback=print):
+    """
+    Remove os áudios menos usados recentemente até que o cache caiba no limite de tamanho.
+    O uso é registrado na data de modificação de cada arquivo.
+
+    Args:
+        max_bytes (int): Tamanho máximo do cache em bytes.
+        log_callback (function): Função para log de mensagens.
+
+    Returns:
+        None
+    """
+    if not os.path.isdir(TTS_CACHE_DIR):
+        return
+    entries = []
+    with os.scandir(TTS_CACHE_DIR) as it:
+        for entry in it:
+            if entry.is_file() and entry.name.endswith(".mp3"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+    total_size = sum(size for _, size, _ in entries)
+    removed = 0
+    for _, size, path in sorted(entries):
+        if total_size <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total_size -= size
+        removed += 1
+    if removed:
+        log_callback(f"Cache TTS: {removed} áudio(s) antigo(s) removido(s).", "INFO", "geral")
+
+def split_tts_text(text, max_chars=GOOGLE_TTS_MAX_CHARS):
+    """
+    Divide o texto em trechos aceitos pelo Google TTS, utilizando o tokenizador do gTTS
+    (pontuação) e, se necessário, os espaços entre palavras.
+
+    Args:
+        text (str): Texto a ser convertido em áudio.
+        max_chars (int): Tamanho máximo de cada trecho.
+
+    Returns:
+        list: Lista de trechos do texto.
+    """
+    text = " ".join(text.split())
+    if len(text) <= max_chars:
+        return [text] if text else []
+    tokenizer = Tokenizer([
+        tokenizer_cases.tone_marks,
+        tokenizer_cases.period_comma,
+        tokenizer_cases.colon,
+        tokenizer_cases.other_punctuation,
+    ])
+    parts = []
+    for token in tokenizer.run(text):
+        token = token.strip()
+        while len(token) > max_chars:
+            cut = token.rfind(" ", 0, max_chars + 1)
+            if cut <= 0:
+                cut = max_chars
+            parts.append(token[:cut].strip())
+            token = token[cut:].strip()
+        if token:
+            parts.append(token)
+    return parts
+
+async def fetch_google_tts(session, text, lang, output_path):
+    """
+    Baixa o áudio (MP3) do Google TTS para o texto informado, gravando os trechos em sequência.
+
+    Args:
+        session (aiohttp.ClientSession): Sessão HTTP compartilhada entre as requisições.
+        text (str): Texto a ser convertido em áudio.
+        lang (str): Código do idioma utilizado no TTS.
+        output_path (str): Caminho para salvar o arquivo de áudio.
+
+    Returns:
+        None
+    """
+    parts = split_tts_text(text)
+    if not parts:
+        raise ValueError("Nenhum texto para converter em áudio")
+    with open(output_path, "wb") as f:
+        for idx, part in enumerate(parts):
+            params = {
+                "ie": "UTF-8",
+                "q": part,
+                "tl": lang,
+                "client": "tw-ob",
+                "total": str(len(parts)),
+                "idx": str(idx),
+                "textlen": str(len(part)),
+            }
+            async with session.get(GOOGLE_TTS_URL, params=params) as response:
+                response.raise_for_status()
+                async for chunk in response.content.iter_chunked(64 * 1024):
+                    f.write(chunk)
+
+def write_silent_wav(output_path, duration_ms):
+    """
+    Grava um arquivo WAV silencioso no formato de mixagem, escrevendo o cabeçalho RIFF
+    e os bytes zerados diretamente, sem montar nem codificar um áudio em memória.
+
+    Args:
+        output_path (str): Caminho para salvar o arquivo de áudio.
+        duration_ms (int): Duração do silêncio em milissegundos.
+
+    Returns:
+        None
+    """
+    block_align = MIX_CHANNELS * MIX_SAMPLE_WIDTH
+    data_size = int(duration_ms * MIX_FRAME_RATE / 1000) * block_align
+    header = struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF", 36 + data_size, b"WAVE",
+        b"fmt ", 16, 1, MIX_CHANNELS, MIX_FRAME_RATE, MIX_FRAME_RATE * block_align, block_align, MIX_SAMPLE_WIDTH * 8,
+        b"data", data_size
+    )
+    zeros = memoryview(bytes(min(data_size, 64 * 1024)))
+    with open(output_path, "wb") as f:
+        f.write(header)
+        remaining = data_size
+        while remaining > 0:
+            chunk = min(remaining, len(zeros))
+            f.write(zeros[:chunk])
+            remaining -= chunk
+
+def decode_to_wav(input_file, output_file):
     """
-    Gera um segmento de áudio a partir de um texto utilizando o Google TTS de forma assíncrona.
+    Converte um arquivo de áudio (o MP3 do Google TTS) para WAV no formato canônico de mixagem
+    com o ffmpeg.
+
+    Args:
+        input_file (str): Caminho para o arquivo de áudio de entrada.
+        output_file (str): Caminho para salvar o arquivo WAV.
+
+    Returns:
+        subprocess.CompletedProcess: Resultado da execução do ffmpeg.
+    """
+    command = ["ffmpeg", "-y", "-v", "error", "-i", input_file, *CANONICAL_WAV_ARGS, output_file]
+    return subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+
+async def async_generate_tts_segment(session, text, output_audio, duration_ms=None, log_callback=print, lang="pt", decode_sem=None, use_cache=True):
+    """
+    Gera um segmento de áudio WAV a partir de um texto utilizando o Google TTS de forma assíncrona.
+    O áudio é reaproveitado do cache em disco quando o mesmo texto já foi gerado no mesmo idioma,
+    e o MP3 é convertido para WAV assim que fica disponível.
     Em caso de erro, gera um áudio silencioso com a duração especificada.
 
     Args:
+        session (aiohttp.ClientSession): Sessão HTTP utilizada nas requisições ao Google TTS.
         text (str): Texto a ser convertido em áudio.
         output_audio (str): Caminho para salvar o arquivo de áudio.
         duration_ms (int, opcional): Duração desejada do áudio em milissegundos.
         log_callback (function): Função para log de mensagens.
+        lang (str): Código do idioma utilizado no TTS.
+        decode_sem (asyncio.Semaphore, opcional): Limita as conversões para WAV executadas ao mesmo tempo.
+        use_cache (bool): Se False, o MP3 é baixado em um arquivo temporário ao lado de `output_audio`
+            e descartado após a conversão, sem passar pelo cache.
 
     Returns:
         None
     """
-    log_callback(f"Gerando TTS para: {text[:30]}... (Google TTS)", "INFO", "tts_gerando")
+    # Remove o trecho de uma execução anterior (versões antigas o criavam como link para o cache)
+    if os.path.lexists(output_audio):
+        os.remove(output_audio)
+    cache_path = get_tts_cache_path(text, lang) if use_cache else None
+    temp_path = None
     try:
+        from_cache = cache_path is not None and os.path.exists(cache_path)
+        if from_cache:
+            # Atualiza a data de uso para a política de remoção do cache
+            os.utime(cache_path)
+            source_path = cache_path
+        else:
+            log_callback(f"Gerando TTS para: {text[:30]}... (Google TTS)", "INFO", "tts_gerando")
+            # Grava em um arquivo temporário para que tarefas simultâneas nunca leiam um cache incompleto
+            fetch_dir = TTS_CACHE_DIR if use_cache else os.path.dirname(output_audio)
+            fd, temp_path = tempfile.mkstemp(suffix=".tmp", dir=fetch_dir)
+            os.close(fd)
+            await fetch_google_tts(session, text, lang, temp_path)
+            if cache_path is not None:
+                os.replace(temp_path, cache_path)
+                source_path = cache_path
+            else:
+                source_path = temp_path
+        # A conversão roda em uma thread para não bloquear o loop de eventos
         loop = asyncio.get_running_loop()
-        # Executa a geração do áudio em um executor para não bloquear o loop de eventos
-        await loop.run_in_executor(None, lambda: gTTS(text, lang="pt").save(output_audio))
-        log_callback(f"Trecho salvo em: {output_audio}", "INFO", "tts_sucesso")
+        if decode_sem is None:
+            result = await loop.run_in_executor(None, decode_to_wav, source_path, output_audio)
+        else:
+            async with decode_sem:
+                result = await loop.run_in_executor(None, decode_to_wav, source_path, output_audio)
+        if result.returncode != 0:
+            # O ffmpeg não conseguiu decodificar o áudio: a entrada do cache está corrompida e é descartada
+            if cache_path is not None and os.path.exists(cache_path):
+                os.remove(cache_path)
+            raise RuntimeError(f"Falha ao converter {source_path}: {result.stderr.decode(errors='replace').strip()}")
+        if from_cache:
+            log_callback(f"Trecho salvo (cache) em: {output_audio}", "INFO", "tts_sucesso")
+        else:
+            log_callback(f"Trecho salvo em: {output_audio}", "INFO", "tts_sucesso")
         return
     except Exception as e:
         log_callback(f"Erro no Google TTS: {e}", "ERROR", "tts_gerando")
+    finally:
+        if temp_path is not None and os.path.exists(temp_path):
+            os.remove(temp_path)
     # Em caso de erro, gera um áudio silencioso com a duração especificada ou padrão de 1 segundo
     if duration_ms is not None and duration_ms > 0:
         log_callback(f"Gerando áudio silencioso para {duration_ms} ms", "INFO", "tts_gerando")
-        silent_audio = AudioSegment.silent(duration=duration_ms)
-        silent_audio.export(output_audio, format="wav")
+        write_silent_wav(output_audio, duration_ms)
     else:
-        silent_audio = AudioSegment.silent(duration=1000)
-        silent_audio.export(output_audio, format="wav")
+        write_silent_wav(output_audio, 1000)
     log_callback(f"Trecho salvo (silencioso) em: {output_audio}", "INFO", "tts_sucesso")
 
-async def process_subtitles_batch(subtitles, batch_size, source_language, target_language, temp_audio_dir, log_callback, progress_callback, cancel_flag):
+def build_translation_batches(texts, max_texts=TRANSLATE_BATCH_MAX_TEXTS, max_chars=TRANSLATE_BATCH_MAX_CHARS):
+    """
+    Agrupa os textos em lotes respeitando o número máximo de textos e de caracteres por requisição.
+
+    Args:
+        texts (list): Lista de textos a serem traduzidos.
+        max_texts (int): Número máximo de textos por lote.
+        max_chars (int): Número máximo de caracteres por lote, incluindo os separadores.
+
+    Returns:
+        list: Lista de lotes, cada um contendo os índices dos textos em `texts`.
+    """
+    batches = []
+    current = []
+    current_chars = 0
+    for i, text in enumerate(texts):
+        size = len(text) + 1
+        if current and (len(current) >= max_texts or current_chars + size > max_chars):
+            batches.append(current)
+            current = []
+            current_chars = 0
+        current.append(i)
+        current_chars += size
+    if current:
+        batches.append(current)
+    return batches
+
+def translate_batch(translator, texts):
+    """
+    Traduz uma lista de textos em uma única requisição, unindo-os com quebras de linha.
+    Caso a requisição falhe ou o resultado não preserve uma linha por texto, cada texto
+    é traduzido individualmente.
+
+    Args:
+        translator (GoogleTranslator): Tradutor configurado com os idiomas de origem e destino.
+        texts (list): Lista de textos a serem traduzidos.
+
+    Returns:
+        list: Textos traduzidos, na mesma ordem de `texts`.
+    """
+    # Cada texto precisa ocupar exatamente uma linha para que o resultado possa ser separado
+    texts = [" ".join(text.split()) for text in texts]
+    try:
+        translated = translator.translate("\n".join(texts))
+        lines = translated.split("\n") if translated else []
+    except Exception:
+        lines = []
+    if len(lines) != len(texts):
+        return translator.translate_batch(texts)
+    return [line.strip() for line in lines]
+
+async def gather_or_cancel(coroutines):
+    """
+    Executa as corrotinas em paralelo, como asyncio.gather, mas cancela as tarefas restantes
+    assim que uma delas falha ou é cancelada, para que nada continue rodando no loop persistente.
+
+    Args:
+        coroutines (iterable): Corrotinas a serem executadas.
+
+    Returns:
+        list: Resultados das corrotinas, na mesma ordem.
+    """
+    tasks = [asyncio.ensure_future(coroutine) for coroutine in coroutines]
+    try:
+        return await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+async def process_subtitles_batch(session, subtitles, batch_size, source_language, target_language, temp_audio_dir, log_callback, progress_callback, cancel_flag):
     """
     Processa as legendas em lotes de forma assíncrona, realizando:
       - Tradução do texto do idioma de origem para o idioma de destino.
-      - Geração de áudio TTS do texto traduzido.
+      - Geração de áudio TTS do texto traduzido, uma única vez para cada texto distinto.
       - Criação de um segmento de áudio com o tempo correspondente da legenda.
+        Legendas com o mesmo texto traduzido compartilham o mesmo arquivo de áudio.
 
     Args:
+        session (aiohttp.ClientSession): Sessão HTTP utilizada nas requisições ao Google TTS.
         subtitles (pysrt.SubRipFile): Legendas lidas do arquivo SRT.
         batch_size (int): Número máximo de tarefas simultâneas.
         source_language (str): Código do idioma de origem.
@@ -109,65 +453,96 @@ async def process_subtitles_batch(subtitles, batch_size, source_language, target
     Returns:
         list: Lista de dicionários com informações de cada segmento (início, duração e caminho do arquivo).
     """
-    translator = GoogleTranslator(source=source_language, target=target_language)
     total = len(subtitles)
-    segments = []
     sem = asyncio.Semaphore(batch_size)
+    # As conversões para WAV usam CPU: no máximo uma por núcleo, em paralelo com os downloads
+    decode_sem = asyncio.Semaphore(os.cpu_count() or 1)
+    done = 0
 
-    async def process_subtitle(i, sub):
-        # Verifica se o processamento foi cancelado antes de iniciar a tradução
-        if cancel_flag():
-            raise asyncio.CancelledError("Processamento cancelado pelo usuário antes da tradução")
+    # Calcula o tempo de início e a duração de cada legenda (em milissegundos)
+    starts = np.fromiter((sub.start.ordinal for sub in subtitles), dtype=np.int64, count=total)
+    ends = np.fromiter((sub.end.ordinal for sub in subtitles), dtype=np.int64, count=total)
+    durations = ends - starts
+
+    originals = [sub.text.replace(">>", "").strip() for sub in subtitles]
+    # Legendas vazias ou sem duração válida não são traduzidas nem geram áudio
+    pending = [i for i, text in enumerate(originals) if text and durations[i] > 0]
+    translations = [None] * total
+
+    async def translate_texts(indices):
         async with sem:
-            texto_original = sub.text.replace(">>", "").strip()
-            if not texto_original:
-                progress_callback(i + 1, total)
-                return None
-            # Realiza a tradução do texto de forma assíncrona
+            # Verifica se o processamento foi cancelado enquanto a tarefa aguardava sua vez
+            if cancel_flag():
+                raise asyncio.CancelledError("Processamento cancelado pelo usuário antes da tradução")
+            # Realiza a tradução do lote de forma assíncrona
             loop = asyncio.get_running_loop()
-            texto_traduzido = await loop.run_in_executor(None, translator.translate, texto_original)
-            # Verifica se houve cancelamento após a tradução
+            texts = [originals[i] for i in indices]
+            # Cada lote usa seu próprio tradutor: o GoogleTranslator guarda o texto da requisição
+            # em estado interno e não pode ser compartilhado entre threads
+            translator = GoogleTranslator(source=source_language, target=target_language)
+            result = await loop.run_in_executor(None, translate_batch, translator, texts)
+        for i, texto_traduzido in zip(indices, result):
+            translations[i] = texto_traduzido
+
+    async def generate_audio(k, texto_traduzido, indices):
+        nonlocal done
+        async with sem:
+            # Verifica se o processamento foi cancelado enquanto a tarefa aguardava sua vez
             if cancel_flag():
-                raise asyncio.CancelledError("Processamento cancelado pelo usuário após tradução")
-            # Calcula o tempo de início e fim do segmento (em milissegundos)
-            start_ms = (sub.start.hours * 3600000 +
-                        sub.start.minutes * 60000 +
-                        sub.start.seconds * 1000 +
-                        sub.start.milliseconds)
-            end_ms = (sub.end.hours * 3600000 +
-                      sub.end.minutes * 60000 +
-                      sub.end.seconds * 1000 +
-                      sub.end.milliseconds)
-            duration_ms = end_ms - start_ms
-            # Define o caminho para salvar o segmento de áudio
-            segment_audio_path = os.path.join(temp_audio_dir, f"segment_{i}.wav")
-            await async_generate_tts_segment(texto_traduzido, segment_audio_path, duration_ms, log_callback)
-            progress_callback(i + 1, total)
-            return {"start": start_ms, "duration": duration_ms, "file": segment_audio_path}
-
-    tasks = [process_subtitle(i, sub) for i, sub in enumerate(subtitles)]
+                raise asyncio.CancelledError("Processamento cancelado pelo usuário antes do TTS")
+            # O silêncio de fallback deve cobrir a maior legenda que utiliza este texto
+            duration_ms = int(durations[indices].max())
+            segment_audio_path = os.path.join(temp_audio_dir, f"segment_{k}.wav")
+            await async_generate_tts_segment(
+                session, texto_traduzido, segment_audio_path, duration_ms, log_callback,
+                lang=target_language, decode_sem=decode_sem, use_cache=use_cache
+            )
+            done += len(indices)
+            progress_callback(done, total)
+            return segment_audio_path
+
     try:
-        results = await asyncio.gather(*tasks)
+        # Etapa 1: traduz todas as legendas em lotes
+        batches = build_translation_batches([originals[i] for i in pending])
+        await gather_or_cancel(translate_texts([pending[j] for j in batch]) for batch in batches)
+        # Verifica se houve cancelamento após a tradução
+        if cancel_flag():
+            raise asyncio.CancelledError("Processamento cancelado pelo usuário após tradução")
+        # Etapa 2: gera um único áudio para cada texto traduzido distinto
+        usages = {}
+        for i, texto_traduzido in enumerate(translations):
+            if texto_traduzido:
+                usages.setdefault(texto_traduzido, []).append(i)
+        log_callback(f"{len(usages)} áudio(s) distinto(s) para {total} legenda(s).", "INFO", "geral")
+        done = total - sum(len(indices) for indices in usages.values())
+        progress_callback(done, total)
+        unique_texts = list(usages)
+        use_cache = tts_cache_available(log_callback)
+        paths = await gather_or_cancel(
+            generate_audio(k, text, usages[text]) for k, text in enumerate(unique_texts)
+        )
     except asyncio.CancelledError as e:
         log_callback("Processamento cancelado pelo usuário.", "ERROR", "geral")
         raise e
 
-    for r in results:
-        if r is not None:
-            segments.append(r)
+    # Etapa 3: associa cada legenda ao áudio compartilhado do seu texto
+    segments = []
+    for text, path in zip(unique_texts, paths):
+        for i in usages[text]:
+            segments.append({"start": int(starts[i]), "duration": int(durations[i]), "file": path})
+    if use_cache:
+        prune_tts_cache(log_callback=log_callback)
     return segments
 
-def change_audio_speed_ffmpeg(input_file, output_file, factor):
+def build_atempo_filter(factor):
     """
-    Ajusta a velocidade do áudio utilizando o filtro 'atempo' do ffmpeg.
+    Monta a cadeia de filtros 'atempo' do ffmpeg para o fator de velocidade informado.
 
     Args:
-        input_file (str): Caminho para o arquivo de áudio de entrada.
-        output_file (str): Caminho para salvar o áudio ajustado.
-        factor (float): Fator de ajuste de velocidade (maior que 1 aumenta a duração, menor diminui).
+        factor (float): Fator de ajuste de velocidade (maior que 1 encurta o áudio).
 
     Returns:
-        None
+        str: Cadeia de filtros, por exemplo "atempo=2.0,atempo=1.25".
     """
     filters = []
     remaining = factor
@@ -176,14 +551,116 @@ def change_audio_speed_ffmpeg(input_file, output_file, factor):
         filters.append("atempo=2.0")
         remaining /= 2.0
     filters.append(f"atempo={remaining}")
-    filter_str = ",".join(filters)
-    command = ["ffmpeg", "-y", "-i", input_file, "-filter:a", filter_str, output_file]
-    subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    return ",".join(filters)
+
+def run_atempo_ffmpeg(jobs):
+    """
+    Executa uma única vez o ffmpeg com um ramo 'atempo' e uma saída para cada arquivo.
+
+    Args:
+        jobs (list): Lista de tuplas (arquivo de entrada, arquivo de saída, fator de velocidade).
+
+    Returns:
+        subprocess.CompletedProcess: Resultado da execução do ffmpeg.
+    """
+    command = ["ffmpeg", "-y", "-v", "error"]
+    for input_file, _, _ in jobs:
+        command += ["-i", input_file]
+    filter_graph = ";".join(
+        f"[{i}:a]{build_atempo_filter(factor)}[o{i}]" for i, (_, _, factor) in enumerate(jobs)
+    )
+    command += ["-filter_complex", filter_graph]
+    for i, (_, output_file, _) in enumerate(jobs):
+        command += ["-map", f"[o{i}]", *CANONICAL_WAV_ARGS, output_file]
+    return subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+
+def change_audio_speed_ffmpeg_batch(jobs, chunk_size=FFMPEG_BATCH_SIZE, log_callback=print):
+    """
+    Ajusta a velocidade de vários áudios utilizando o filtro 'atempo' do ffmpeg.
+    Os arquivos são processados em grupos, com uma única execução do ffmpeg por grupo
+    (um ramo do filtro e uma saída para cada arquivo). Se a execução de um grupo falhar,
+    os arquivos desse grupo são processados um a um, para que um arquivo inválido não
+    impeça o ajuste dos demais.
+
+    Args:
+        jobs (list): Lista de tuplas (arquivo de entrada, arquivo de saída, fator de velocidade),
+            onde o fator maior que 1 encurta o áudio.
+        chunk_size (int): Número máximo de arquivos por execução do ffmpeg.
+        log_callback (function): Função para log de mensagens.
+
+    Returns:
+        None
+    """
+    for start in range(0, len(jobs), chunk_size):
+        chunk = jobs[start:start + chunk_size]
+        result = run_atempo_ffmpeg(chunk)
+        if result.returncode == 0:
+            continue
+        stderr = result.stderr.decode(errors="replace").strip()
+        if len(chunk) == 1:
+            log_callback(f"Erro ao ajustar a velocidade de {chunk[0][0]}: {stderr}", "ERROR", "geral")
+            continue
+        log_callback(
+            f"Erro ao ajustar a velocidade de {len(chunk)} segmento(s) em lote: {stderr}. "
+            "Processando um a um.", "ERROR", "geral"
+        )
+        for job in chunk:
+            result = run_atempo_ffmpeg([job])
+            if result.returncode != 0:
+                stderr = result.stderr.decode(errors="replace").strip()
+                log_callback(f"Erro ao ajustar a velocidade de {job[0]}: {stderr}", "ERROR", "geral")
+
+def check_wav_format(params):
+    """
+    Verifica se os parâmetros de um WAV correspondem ao formato canônico de mixagem.
+
+    Args:
+        params (wave._wave_params): Parâmetros retornados por wave.Wave_read.getparams().
+
+    Raises:
+        ValueError: Se a taxa de amostragem, o número de canais ou a largura da amostra forem diferentes.
+    """
+    if (params.framerate, params.nchannels, params.sampwidth) != (MIX_FRAME_RATE, MIX_CHANNELS, MIX_SAMPLE_WIDTH):
+        raise ValueError(
+            f"formato {params.framerate} Hz/{params.nchannels} canal(is)/{params.sampwidth * 8} bits inesperado"
+        )
+
+def get_audio_duration_ms(audio_path):
+    """
+    Retorna a duração de um WAV no formato canônico em milissegundos, lendo apenas o cabeçalho.
+
+    Args:
+        audio_path (str): Caminho para o arquivo WAV.
+
+    Returns:
+        int: Duração do áudio em milissegundos.
+    """
+    with wave.open(audio_path, "rb") as wav_file:
+        params = wav_file.getparams()
+    check_wav_format(params)
+    return params.nframes * 1000 // MIX_FRAME_RATE
+
+def read_wav_samples(audio_path):
+    """
+    Lê as amostras de um WAV no formato canônico, sem nenhuma conversão.
+
+    Args:
+        audio_path (str): Caminho para o arquivo WAV.
+
+    Returns:
+        numpy.ndarray: Amostras PCM 16 bits intercaladas por canal.
+    """
+    with wave.open(audio_path, "rb") as wav_file:
+        check_wav_format(wav_file.getparams())
+        return np.frombuffer(wav_file.readframes(wav_file.getnframes()), dtype="<i2")
 
 def combine_audio_segments_gui(segments, output_audio, total_duration_ms, log_callback, progress_callback):
     """
     Combina os segmentos de áudio ajustando cada trecho para a duração correta e sincronizando com o vídeo.
-    Preenche eventuais lacunas com áudio silencioso e salva o áudio final.
+    As amostras de cada segmento são copiadas para um único buffer numpy pré-alocado com a duração
+    total do vídeo, na posição de início da legenda; as regiões não preenchidas já são silêncio.
+    Os segmentos maiores que a duração esperada são identificados pelo cabeçalho e acelerados em
+    lote antes da mixagem, de modo que cada arquivo é decodificado uma única vez.
 
     Args:
         segments (list): Lista de dicionários contendo informações de cada segmento.
@@ -196,73 +673,167 @@ def combine_audio_segments_gui(segments, output_audio, total_duration_ms, log_ca
         None
     """
     log_callback("Combinando segmentos de áudio...", "INFO", "geral")
-    final_audio = AudioSegment.silent(duration=0)
-    current_time = 0
     segments.sort(key=lambda x: x["start"])
     total = len(segments)
+    total_samples = int(total_duration_ms * MIX_FRAME_RATE / 1000) * MIX_CHANNELS
+    final_samples = np.zeros(total_samples, dtype="<i2")
+
+    # Identifica, sem decodificar, quais segmentos precisam ser acelerados. Acelerações pequenas são
+    # feitas em memória com o soxr (se instalado); as demais, em lote com o 'atempo' do ffmpeg
+    sources = []
+    adjustments = []
     for idx, seg in enumerate(segments):
-        progress_callback(idx + 1, total)
-        scheduled_start = seg["start"]
         expected_duration = seg["duration"]
-        # Se houver intervalo entre segmentos, adiciona silêncio para sincronização
-        if scheduled_start > current_time:
-            gap = scheduled_start - current_time
-            final_audio += AudioSegment.silent(duration=gap)
-            current_time = scheduled_start
+        if expected_duration <= 0:
+            log_callback(f"Segmento {seg['file']} sem duração válida. Pulando este segmento.", "ERROR", "geral")
+            sources.append((None, None))
+            continue
+        if int(seg["start"] * MIX_FRAME_RATE / 1000) * MIX_CHANNELS >= total_samples:
+            sources.append((None, None))
+            continue
         try:
-            # Carrega o segmento de áudio detectando o formato automaticamente
-            seg_audio = AudioSegment.from_file(seg["file"])
+            actual_duration = get_audio_duration_ms(seg["file"])
         except Exception as e:
             log_callback(f"Erro ao ler {seg['file']}: {e}. Pulando este segmento.", "ERROR", "geral")
+            sources.append((None, None))
             continue
-        actual_duration = len(seg_audio)
-        # Ajusta o segmento para que a duração corresponda à esperada
-        if actual_duration > expected_duration:
-            factor = actual_duration / expected_duration
+        factor = actual_duration / expected_duration
+        if factor <= 1:
+            sources.append((seg["file"], None))
+        elif soxr is not None and factor <= SOXR_MAX_FACTOR:
+            sources.append((seg["file"], factor))
+        else:
             adjusted_file = os.path.join(os.path.dirname(seg["file"]), f"adjusted_{idx}.wav")
-            change_audio_speed_ffmpeg(seg["file"], adjusted_file, factor)
-            seg_audio = AudioSegment.from_file(adjusted_file)
-            if len(seg_audio) > expected_duration:
-                seg_audio = seg_audio[:expected_duration]
-            elif len(seg_audio) < expected_duration:
-                seg_audio += AudioSegment.silent(duration=expected_duration - len(seg_audio))
-        elif actual_duration < expected_duration:
-            seg_audio += AudioSegment.silent(duration=expected_duration - actual_duration)
-        final_audio += seg_audio
-        current_time += expected_duration
-    # Garante que o áudio final tenha a duração total do vídeo
-    if len(final_audio) < total_duration_ms:
-        final_audio += AudioSegment.silent(duration=total_duration_ms - len(final_audio))
-    final_audio = final_audio[:total_duration_ms]
-    final_audio.export(output_audio, format="wav")
+            adjustments.append((seg["file"], adjusted_file, factor))
+            sources.append((adjusted_file, None))
+
+    if adjustments:
+        log_callback(f"Ajustando a velocidade de {len(adjustments)} segmento(s)...", "INFO", "geral")
+        change_audio_speed_ffmpeg_batch(adjustments, log_callback=log_callback)
+
+    for idx, (seg, (source, resample_factor)) in enumerate(zip(segments, sources)):
+        progress_callback(idx + 1, total)
+        if source is None:
+            continue
+        try:
+            # Carrega o segmento (original ou ajustado), que já está no formato canônico
+            samples = read_wav_samples(source)
+        except Exception as e:
+            log_callback(f"Erro ao ler {source}: {e}. Pulando este segmento.", "ERROR", "geral")
+            continue
+        if resample_factor is not None:
+            # Encurta o segmento reamostrando-o como se tivesse sido gravado a uma taxa maior
+            frames = samples.reshape(-1, MIX_CHANNELS)
+            samples = soxr.resample(frames, MIX_FRAME_RATE * resample_factor, MIX_FRAME_RATE, quality="HQ").reshape(-1)
+        # Limita o segmento à duração esperada e ao fim do vídeo
+        offset = int(seg["start"] * MIX_FRAME_RATE / 1000) * MIX_CHANNELS
+        expected_samples = int(seg["duration"] * MIX_FRAME_RATE / 1000) * MIX_CHANNELS
+        samples = samples[:min(expected_samples, total_samples - offset)]
+        final_samples[offset:offset + len(samples)] = samples
+
+    # Grava o buffer diretamente no WAV, sem cópias intermediárias
+    with wave.open(output_audio, "wb") as wav_file:
+        wav_file.setnchannels(MIX_CHANNELS)
+        wav_file.setsampwidth(MIX_SAMPLE_WIDTH)
+        wav_file.setframerate(MIX_FRAME_RATE)
+        wav_file.writeframes(memoryview(final_samples).cast("B"))
     log_callback(f"Áudio combinado salvo em: {output_audio}", "INFO", "geral")
 
-def replace_audio(video_path, new_audio_path, output_video_path, base_path, log_callback):
+def split_subtitle_windows(subtitles, total_duration_ms, window_size=SUBTITLE_WINDOW_SIZE):
+    """
+    Divide as legendas em janelas consecutivas, cada uma cobrindo um intervalo de tempo do vídeo.
+    A primeira janela começa em 0, cada janela seguinte começa no início da sua primeira legenda
+    e a última termina no fim do vídeo. Legendas com o mesmo início ficam sempre na mesma janela
+    (que pode então passar de `window_size`), para que nenhuma comece exatamente no fim da sua janela.
+
+    Args:
+        subtitles (pysrt.SubRipFile): Legendas lidas do arquivo SRT.
+        total_duration_ms (int): Duração total do vídeo em milissegundos.
+        window_size (int): Número de legendas por janela.
+
+    Returns:
+        list: Lista de tuplas (legendas da janela, início em ms, fim em ms).
+    """
+    ordered = sorted(subtitles, key=lambda sub: sub.start.ordinal)
+    chunks = [[]]
+    for sub in ordered:
+        current = chunks[-1]
+        if len(current) >= window_size and sub.start.ordinal > current[-1].start.ordinal:
+            chunks.append([sub])
+        else:
+            current.append(sub)
+    bounds = [0] + [min(chunk[0].start.ordinal, total_duration_ms) for chunk in chunks[1:]] + [total_duration_ms]
+    return [(chunk, bounds[k], bounds[k + 1]) for k, chunk in enumerate(chunks)]
+
+def concat_wav_files(input_files, output_file, list_file):
+    """
+    Concatena arquivos WAV do mesmo formato com o demuxer 'concat' do ffmpeg, sem recodificação.
+
+    Args:
+        input_files (list): Caminhos dos arquivos WAV, na ordem de concatenação.
+        output_file (str): Caminho para salvar o arquivo concatenado.
+        list_file (str): Caminho do arquivo de lista utilizado pelo ffmpeg.
+
+    Returns:
+        None
+
+    Raises:
+        RuntimeError: Se o ffmpeg não conseguir concatenar os arquivos.
     """
-    Remove o áudio original do vídeo e insere o novo áudio sincronizado.
+    with open(list_file, "w", encoding="utf-8") as f:
+        for input_file in input_files:
+            escaped = os.path.abspath(input_file).replace("'", "'\\''")
+            f.write(f"file '{escaped}'\n")
+    command = ["ffmpeg", "-y", "-v", "error", "-f", "concat", "-safe", "0", "-i", list_file, "-c", "copy", output_file]
+    try:
+        result = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    finally:
+        os.remove(list_file)
+    if result.returncode != 0:
+        raise RuntimeError(f"Falha ao unir as partes do áudio: {result.stderr.decode(errors='replace').strip()}")
+
+def detect_aac_encoder():
+    """
+    Verifica os codificadores do ffmpeg instalado e escolhe o codificador AAC a ser utilizado.
+
+    Returns:
+        str: "libfdk_aac" se disponível (mais rápido), caso contrário o codificador nativo "aac".
+    """
+    try:
+        result = subprocess.run(
+            ["ffmpeg", "-hide_banner", "-encoders"],
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True
+        )
+    except OSError:
+        return "aac"
+    for line in result.stdout.splitlines():
+        parts = line.split()
+        if len(parts) >= 2 and parts[1] == "libfdk_aac":
+            return "libfdk_aac"
+    return "aac"
+
+def replace_audio(video_path, new_audio_path, output_video_path, log_callback, acodec="aac"):
+    """
+    Substitui o áudio original do vídeo pelo novo áudio sincronizado em uma única execução do ffmpeg,
+    copiando o fluxo de vídeo sem recodificação.
 
     Args:
         video_path (str): Caminho para o vídeo original.
         new_audio_path (str): Caminho para o novo áudio a ser inserido.
         output_video_path (str): Caminho para salvar o vídeo final.
-        base_path (str): Diretório base para arquivos temporários.
         log_callback (function): Função para log de mensagens.
+        acodec (str): Codificador AAC utilizado no novo áudio.
 
     Returns:
         None
     """
-    log_callback("Removendo áudio original do vídeo...", "INFO", "geral")
-    silent_video = os.path.join(base_path, "silent.mp4")
-    # Cria um vídeo sem áudio
-    ffmpeg.input(video_path).output(silent_video, vcodec="copy", an=None, threads=4).run(overwrite_output=True)
-    
     log_callback("Adicionando novo áudio ao vídeo...", "INFO", "geral")
-    # Combina o vídeo silencioso com o novo áudio, mantendo a cópia do vídeo
+    # Usa apenas o vídeo do arquivo original e o áudio novo, mantendo a cópia do vídeo
     ffmpeg.output(
-        ffmpeg.input(silent_video).video,
+        ffmpeg.input(video_path).video,
         ffmpeg.input(new_audio_path).audio,
         output_video_path,
-        vcodec="copy", acodec="aac", threads=4
+        vcodec="copy", acodec=acodec, map_metadata=0, threads=FFMPEG_THREADS
     ).run(overwrite_output=True)
     
     log_callback(f"Vídeo final gerado em: {output_video_path}", "INFO", "geral")
@@ -276,9 +847,40 @@ class Application(tk.Tk):
         super().__init__()
         self.title("Processamento de Vídeo com TTS em Lotes (Google TTS)")
         self.geometry("750x600")
+        self.ui_queue = queue.Queue()  # Eventos de log e progresso enviados pelas outras threads
         self.create_widgets()
+        self.after(UI_REFRESH_MS, self.drain_ui_queue)
         self.base_path = None
         self.cancel_requested = False  # Flag para controle de cancelamento
+        self.video_durations = {}  # Durações já obtidas, por (caminho, data de modificação)
+        self.aac_encoder = None  # Codificador AAC do ffmpeg, detectado no primeiro processamento
+        # Loop de eventos persistente, executado em uma thread dedicada durante toda a aplicação
+        self.loop = asyncio.new_event_loop()
+        threading.Thread(target=self.loop.run_forever, daemon=True).start()
+        self.tts_session = asyncio.run_coroutine_threadsafe(self.create_session(), self.loop).result()
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+
+    async def create_session(self):
+        """
+        Cria a sessão HTTP compartilhada por todos os processamentos, mantendo as conexões
+        e o cache de DNS do Google TTS entre uma execução e outra.
+
+        Returns:
+            aiohttp.ClientSession: Sessão HTTP configurada.
+        """
+        connector = aiohttp.TCPConnector(limit=100, ttl_dns_cache=300)
+        return aiohttp.ClientSession(connector=connector, headers=GOOGLE_TTS_HEADERS)
+
+    def on_close(self):
+        """
+        Encerra a sessão HTTP e o loop de eventos antes de fechar a janela.
+        """
+        try:
+            asyncio.run_coroutine_threadsafe(self.tts_session.close(), self.loop).result(timeout=5)
+        except Exception:
+            pass
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.destroy()
 
     def create_widgets(self):
         """
@@ -384,6 +986,7 @@ class Application(tk.Tk):
     def log_message(self, message, level="INFO", category="geral"):
         """
         Registra uma mensagem com timestamp em um dos campos de log da interface.
+        Pode ser chamada de qualquer thread: a mensagem é enfileirada e exibida pela thread do Tk.
 
         Args:
             message (str): Mensagem a ser registrada.
@@ -392,15 +995,7 @@ class Application(tk.Tk):
         """
         timestamp = datetime.datetime.now().strftime("%H:%M:%S")
         formatted_message = f"[{timestamp}] {message}\n"
-        if category == "tts_gerando":
-            self.log_tts_gerando.insert(tk.END, formatted_message, level)
-            self.log_tts_gerando.see(tk.END)
-        elif category == "tts_sucesso":
-            self.log_tts_sucesso.insert(tk.END, formatted_message, level)
-            self.log_tts_sucesso.see(tk.END)
-        else:
-            self.log_geral.insert(tk.END, formatted_message, level)
-            self.log_geral.see(tk.END)
+        self.ui_queue.put(("log", formatted_message, level, category))
     
     def update_progress_subtitles(self, value, maximum):
         """
@@ -410,9 +1005,7 @@ class Application(tk.Tk):
             value (int): Valor atual do progresso.
             maximum (int): Valor máximo da barra de progresso.
         """
-        self.progress_subtitles['maximum'] = maximum
-        self.progress_subtitles['value'] = value
-        self.progress_subtitles.update_idletasks()
+        self.ui_queue.put(("prog_sub", value, maximum))
     
     def update_progress_audio(self, value, maximum):
         """
@@ -422,9 +1015,62 @@ class Application(tk.Tk):
             value (int): Valor atual do progresso.
             maximum (int): Valor máximo da barra de progresso.
         """
-        self.progress_audio['maximum'] = maximum
-        self.progress_audio['value'] = value
-        self.progress_audio.update_idletasks()
+        self.ui_queue.put(("prog_audio", value, maximum))
+    
+    def finish_processing(self):
+        """
+        Libera os botões da interface ao final (ou interrupção) do processamento.
+        """
+        self.ui_queue.put(("finish",))
+    
+    def drain_ui_queue(self):
+        """
+        Aplica na interface os eventos enfileirados pelas outras threads e agenda a próxima verificação.
+        Das atualizações de progresso, apenas a mais recente de cada barra é desenhada.
+        """
+        progress = {}
+        while True:
+            try:
+                event = self.ui_queue.get_nowait()
+            except queue.Empty:
+                break
+            kind = event[0]
+            if kind == "log":
+                _, formatted_message, level, category = event
+                if category == "tts_gerando":
+                    log_widget = self.log_tts_gerando
+                elif category == "tts_sucesso":
+                    log_widget = self.log_tts_sucesso
+                else:
+                    log_widget = self.log_geral
+                log_widget.insert(tk.END, formatted_message, level)
+                log_widget.see(tk.END)
+            elif kind in ("prog_sub", "prog_audio"):
+                progress[kind] = event[1:]
+            elif kind == "finish":
+                self.btn_start.config(state="normal")
+                self.btn_cancel.config(state="disabled")
+        for kind, (value, maximum) in progress.items():
+            bar = self.progress_subtitles if kind == "prog_sub" else self.progress_audio
+            bar['maximum'] = maximum
+            bar['value'] = value
+        self.after(UI_REFRESH_MS, self.drain_ui_queue)
+    
+    def get_video_duration(self, video_path):
+        """
+        Retorna a duração do vídeo em milissegundos, consultando o ffprobe apenas uma vez
+        enquanto o arquivo não for modificado.
+
+        Args:
+            video_path (str): Caminho para o arquivo de vídeo.
+
+        Returns:
+            int: Duração do vídeo em milissegundos.
+        """
+        key = (video_path, os.path.getmtime(video_path))
+        if key not in self.video_durations:
+            self.video_durations[key] = get_video_duration_ms(video_path)
+        return self.video_durations[key]
     
     def cancel_processing(self):
         """
@@ -435,7 +1081,7 @@ class Application(tk.Tk):
     
     def start_processing(self):
         """
-        Verifica se o diretório base foi selecionado e inicia o processamento em uma thread separada.
+        Verifica se o diretório base foi selecionado e envia o processamento para o loop de eventos persistente.
         """
         if not self.base_path:
             self.log_message("Por favor, selecione um diretório base primeiro.", "ERROR", "geral")
@@ -443,32 +1089,58 @@ class Application(tk.Tk):
         self.cancel_requested = False
         self.btn_start.config(state="disabled")
         self.btn_cancel.config(state="normal")
-        thread = threading.Thread(target=self.run_process)
-        thread.start()
+        # As variáveis do Tk são lidas aqui, na thread da interface
+        coroutine = self.run_process(
+            batch_size=self.batch_size_var.get(),
+            source_language=self.source_language.get(),
+            target_language=self.target_language.get()
+        )
+        future = asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+        future.add_done_callback(self.on_process_done)
     
-    def run_process(self):
+    def on_process_done(self, future):
+        """
+        Registra erros inesperados do processamento e libera os botões da interface.
+
+        Args:
+            future (concurrent.futures.Future): Resultado do processamento.
+        """
+        if future.cancelled() or future.exception() is None:
+            return
+        self.log_message(f"Erro no processamento: {future.exception()}", "ERROR", "geral")
+        self.finish_processing()
+    
+    async def run_process(self, batch_size, source_language, target_language):
         """
         Função principal que realiza as seguintes etapas:
           1. Seleciona o arquivo de vídeo (.mp4) e de legendas (.srt) do diretório base.
-          2. Lê e processa as legendas utilizando TTS e tradução.
-          3. Combina os segmentos de áudio para sincronização com o vídeo.
+          2. Lê e processa as legendas utilizando TTS e tradução, em janelas de SUBTITLE_WINDOW_SIZE legendas.
+          3. Combina os segmentos de cada janela em um áudio parcial e une as partes no áudio final.
           4. Substitui o áudio original do vídeo pelo novo áudio gerado.
+        As etapas bloqueantes são executadas em um executor para não bloquear o loop de eventos.
+
+        Args:
+            batch_size (int): Número máximo de tarefas simultâneas.
+            source_language (str): Código do idioma de origem.
+            target_language (str): Código do idioma de destino.
         """
+        loop = asyncio.get_running_loop()
         base_path = self.base_path
-        video_files = glob.glob(os.path.join(base_path, "*.mp4"))
+        # Lista o diretório uma única vez e separa os arquivos pela extensão
+        with os.scandir(base_path) as it:
+            entries = [entry for entry in it if entry.is_file()]
+        video_files = [entry.path for entry in entries if entry.name.lower().endswith(".mp4")]
+        srt_files = [entry.path for entry in entries if entry.name.lower().endswith(".srt")]
         if not video_files:
             self.log_message("Nenhum arquivo .mp4 encontrado no diretório.", "ERROR", "geral")
-            self.btn_start.config(state="normal")
-            self.btn_cancel.config(state="disabled")
+            self.finish_processing()
             return
         video_file = video_files[0]
         self.log_message(f"Arquivo de vídeo selecionado: {video_file}", "INFO", "geral")
         
-        srt_files = glob.glob(os.path.join(base_path, "*.srt"))
         if not srt_files:
             self.log_message("Nenhum arquivo .srt encontrado no diretório.", "ERROR", "geral")
-            self.btn_start.config(state="normal")
-            self.btn_cancel.config(state="disabled")
+            self.finish_processing()
             return
         subtitle_file = srt_files[0]
         self.log_message(f"Arquivo de legendas selecionado: {subtitle_file}", "INFO", "geral")
@@ -479,57 +1151,99 @@ class Application(tk.Tk):
         os.makedirs(temp_audio_dir, exist_ok=True)
         
         self.log_message("Lendo legendas...", "INFO", "geral")
-        subtitles = read_srt_subtitles(subtitle_file)
+        subtitles = await loop.run_in_executor(None, read_srt_subtitles, subtitle_file)
         
-        self.log_message("Processando legendas (TTS em lotes)...", "INFO", "geral")
-        try:
-            segments = asyncio.run(
-                process_subtitles_batch(
-                    subtitles,
-                    batch_size=self.batch_size_var.get(),
-                    source_language=self.source_language.get(),
-                    target_language=self.target_language.get(),
+        self.log_message("Obtendo duração total do vídeo...", "INFO", "geral")
+        total_duration_ms = await loop.run_in_executor(None, self.get_video_duration, video_file)
+        
+        # Processa as legendas em janelas, mixando cada uma em um arquivo parcial
+        windows = split_subtitle_windows(subtitles, total_duration_ms)
+        total_subtitles = len(subtitles)
+        processed_subtitles = 0
+        part_files = []
+        for k, (window, window_start, window_end) in enumerate(windows):
+            self.log_message(
+                f"Processando legendas (TTS em lotes), parte {k + 1} de {len(windows)}...", "INFO", "geral"
+            )
+            try:
+                segments = await process_subtitles_batch(
+                    self.tts_session,
+                    window,
+                    batch_size=batch_size,
+                    source_language=source_language,
+                    target_language=target_language,
                     temp_audio_dir=temp_audio_dir,
                     log_callback=self.log_message,
-                    progress_callback=self.update_progress_subtitles,
+                    progress_callback=lambda value, maximum, offset=processed_subtitles:
+                        self.update_progress_subtitles(offset + value, total_subtitles),
                     cancel_flag=lambda: self.cancel_requested
                 )
-            )
-        except asyncio.CancelledError:
-            self.log_message("Processamento interrompido pelo usuário.", "ERROR", "geral")
-            self.btn_start.config(state="normal")
-            self.btn_cancel.config(state="disabled")
-            return
-        except Exception as e:
-            self.log_message(f"Erro no processamento das legendas: {e}", "ERROR", "geral")
-            self.btn_start.config(state="normal")
-            self.btn_cancel.config(state="disabled")
-            return
-        
-        if self.cancel_requested:
-            self.log_message("Processamento cancelado. Abortando as etapas seguintes.", "ERROR", "geral")
-            self.btn_start.config(state="normal")
-            self.btn_cancel.config(state="disabled")
-            return
-        
-        self.log_message("Obtendo duração total do vídeo...", "INFO", "geral")
-        total_duration_ms = get_video_duration_ms(video_file)
+            except asyncio.CancelledError:
+                self.log_message("Processamento interrompido pelo usuário.", "ERROR", "geral")
+                self.finish_processing()
+                return
+            except Exception as e:
+                self.log_message(f"Erro no processamento das legendas: {e}", "ERROR", "geral")
+                self.finish_processing()
+                return
+            processed_subtitles += len(window)
+            
+            if self.cancel_requested:
+                self.log_message("Processamento cancelado. Abortando as etapas seguintes.", "ERROR", "geral")
+                self.finish_processing()
+                return
+            
+            if window_end > window_start:
+                self.log_message(f"Combinando segmentos de áudio, parte {k + 1} de {len(windows)}...", "INFO", "geral")
+                # Os segmentos são posicionados em relação ao início da janela
+                for seg in segments:
+                    seg["start"] -= window_start
+                part_file = os.path.join(temp_audio_dir, f"part_{k}.wav")
+                await loop.run_in_executor(
+                    None,
+                    functools.partial(
+                        combine_audio_segments_gui,
+                        segments,
+                        part_file,
+                        window_end - window_start,
+                        log_callback=self.log_message,
+                        progress_callback=lambda value, maximum, k=k:
+                            self.update_progress_audio(k + value / maximum, len(windows))
+                    )
+                )
+                part_files.append(part_file)
+            
+            # Remove os segmentos desta janela, mantendo apenas os arquivos parciais
+            with os.scandir(temp_audio_dir) as it:
+                for entry in it:
+                    if entry.is_file() and not entry.name.startswith("part_"):
+                        os.remove(entry.path)
+            del segments
+            gc.collect()
         
-        self.log_message("Combinando segmentos de áudio...", "INFO", "geral")
-        combine_audio_segments_gui(
-            segments,
+        self.log_message("Unindo as partes do áudio...", "INFO", "geral")
+        await loop.run_in_executor(
+            None,
+            concat_wav_files,
+            part_files,
             output_audio_file,
-            total_duration_ms,
-            log_callback=self.log_message,
-            progress_callback=self.update_progress_audio
+            os.path.join(temp_audio_dir, "parts.txt")
         )
+        for part_file in part_files:
+            os.remove(part_file)
+        self.log_message(f"Áudio combinado salvo em: {output_audio_file}", "INFO", "geral")
         
         self.log_message("Substituindo áudio original do vídeo...", "INFO", "geral")
-        replace_audio(video_file, output_audio_file, output_video, base_path, self.log_message)
+        if self.aac_encoder is None:
+            self.aac_encoder = await loop.run_in_executor(None, detect_aac_encoder)
+            self.log_message(f"Codificador AAC selecionado: {self.aac_encoder}", "INFO", "geral")
+        await loop.run_in_executor(
+            None,
+            lambda: replace_audio(video_file, output_audio_file, output_video, self.log_message, acodec=self.aac_encoder)
+        )
         
         self.log_message(f"Processo concluído! O vídeo final está em: {output_video}", "INFO", "geral")
-        self.btn_start.config(state="normal")
-        self.btn_cancel.config(state="disabled")
+        self.finish_processing()
 
 if __name__ == "__main__":
     # Inicializa e executa a interface gráfica